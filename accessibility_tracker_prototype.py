@@ -1,7 +1,21 @@
+import json
 import os
+import sys
+import threading
+import time
 import requests
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    _json_loads = json.loads
 
 load_dotenv()
 
@@ -12,32 +26,85 @@ headers = {}
 if API_KEY:
     headers["x-api-key"] = API_KEY
 
+# (connect, read) timeouts for MBTA API calls
+TIMEOUT = (3, 10)
+
+# Query params for the fetchers; fields[...] limits responses to the attributes we read
+_FACILITIES_PARAMS = {
+    "filter[type]": "ELEVATOR,ESCALATOR,RAMP,PORTABLE_BOARDING_LIFT",
+    "include": "stop",  # Include stop data for station names
+    "fields[facility]": "type,long_name,short_name",
+    "fields[stop]": "name,latitude,longitude,wheelchair_boarding",
+}
+_ALERTS_PARAMS = {
+    "filter[activity]": "USING_WHEELCHAIR,USING_ESCALATOR",
+    "fields[alert]": "header,description,cause,effect,updated_at,active_period,informed_entity",
+}
+_ROUTE_ALERT_FIELDS = "header,description,effect,informed_entity"
+
+# High-impact service alert effects worth mentioning in a station report.
+# Facility closures are tracked separately and per-train delays are too noisy.
+_KEEP_EFFECTS = frozenset({
+    "SHUTTLE", "SUSPENSION", "DETOUR", "SERVICE_CHANGE",
+    "STOP_CLOSURE", "STOP_MOVE", "STATION_ISSUE",
+})
+
+# One pooled session for every HTTP call so repeat requests to the MBTA API
+# reuse a kept-alive HTTPS connection instead of paying a new TLS handshake.
+# The API key stays in per-call headers so it is never sent to Ollama.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# Worker threads for issuing independent API calls concurrently
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+
+# Decoded MBTA responses keyed by (url, params) -> (fresh_until, data)
+_RESPONSE_CACHE = {}
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _get_json(url, params, ttl):
+    """GET a JSON document from the MBTA API, reusing a cached copy for ttl seconds.
+
+    If a refresh fails and an earlier response is cached, the stale copy is
+    returned instead of raising, so a transient API error or rate limit
+    doesn't blank the app.
+    """
+    key = (url, tuple(sorted(params.items())))
+    now = time.monotonic()
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    try:
+        response = _SESSION.get(url, headers=headers, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        data = _json_loads(response.content)
+    except (requests.RequestException, ValueError):
+        if entry is not None:
+            return entry[1]
+        raise
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (now + ttl, data)
+    return data
+
 
 def fetch_facilities():
     """Fetch elevators, escalators, ramps, and portable lifts from MBTA."""
-    response = requests.get(
-        f"{BASE_URL}/facilities",
-        headers=headers,
-        params={
-            "filter[type]": "ELEVATOR,ESCALATOR,RAMP,PORTABLE_BOARDING_LIFT",
-            "include": "stop"  # Include stop data for station names
-        }
-    )
-    response.raise_for_status()
-    return response.json()
+    # Facility inventory changes rarely, so cache it for a couple of minutes
+    return _get_json(f"{BASE_URL}/facilities", _FACILITIES_PARAMS, ttl=120)
 
 
 def fetch_accessibility_alerts():
     """Fetch current alerts affecting elevator/escalator users."""
-    response = requests.get(
-        f"{BASE_URL}/alerts",
-        headers=headers,
-        params={
-            "filter[activity]": "USING_WHEELCHAIR,USING_ESCALATOR"
-        }
-    )
-    response.raise_for_status()
-    return response.json()
+    return _get_json(f"{BASE_URL}/alerts", _ALERTS_PARAMS, ttl=5)
 
 
 def fetch_route_alerts(stop_id):
@@ -48,43 +115,27 @@ def fetch_route_alerts(stop_id):
     passing through the given stop.  Facility-specific alerts (elevator/
     escalator closures) are excluded since they are already tracked separately.
     """
-    # 1. Discover which routes serve this stop
-    routes_resp = requests.get(
-        f"{BASE_URL}/routes",
-        headers=headers,
-        params={"filter[stop]": stop_id},
-    )
-    routes_resp.raise_for_status()
-    route_ids = [r["id"] for r in routes_resp.json().get("data", [])]
-    if not route_ids:
-        return []
-
-    # 2. Fetch alerts for those routes
-    alerts_resp = requests.get(
+    # 1. Fetch alerts touching this stop in one round trip; the API matches
+    # alerts on the routes serving the stop as well as the stop itself.
+    alerts_data = _get_json(
         f"{BASE_URL}/alerts",
-        headers=headers,
-        params={"filter[route]": ",".join(route_ids)},
+        {"filter[stop]": stop_id, "fields[alert]": _ROUTE_ALERT_FIELDS},
+        ttl=5,
     )
-    alerts_resp.raise_for_status()
 
-    # 3. Keep only high-impact service alerts that affect travel through this station.
+    # 2. Keep only high-impact service alerts that affect travel through this station.
     # Skip facility closures (handled separately) and per-train delays (noisy, transient).
-    keep_effects = {
-        "SHUTTLE", "SUSPENSION", "DETOUR", "SERVICE_CHANGE",
-        "STOP_CLOSURE", "STOP_MOVE", "STATION_ISSUE",
-    }
     service_alerts = []
-    for alert in alerts_resp.json().get("data", []):
+    for alert in alerts_data.get("data", []):
         attr = alert["attributes"]
         effect = attr.get("effect", "")
-        if effect not in keep_effects:
+        if effect not in _KEEP_EFFECTS:
             continue
         # Skip STATION_ISSUE alerts about other stations (header starts with station name)
         header = attr.get("header", "")
         if effect == "STATION_ISSUE":
             entities = attr.get("informed_entity", [])
-            stop_ids = {e.get("stop") for e in entities if "stop" in e}
-            if stop_id not in stop_ids:
+            if not any(e.get("stop") == stop_id for e in entities):
                 continue
         service_alerts.append({
             "header": header,
@@ -94,24 +145,19 @@ def fetch_route_alerts(stop_id):
     return service_alerts
 
 
-def extract_facility_ids_from_alert(alert):
-    """Extract facility IDs from an alert's informed_entity list."""
-    facility_ids = []
-    informed_entities = alert.get("attributes", {}).get("informed_entity", [])
-    for entity in informed_entities:
-        if "facility" in entity:
-            facility_ids.append(entity["facility"])
-    return facility_ids
+def _intern(value):
+    """Intern a low-cardinality string field (type, cause, effect) so repeats share storage."""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
-def get_data_for_app():
+def _build_facilities(facilities_data, alerts_data):
     """
-    Return facilities and stations for the Shiny app (map + station details).
-    Stations include id, name, lat, lon, and outage counts for map styling.
+    Merge raw facility and alert responses into a facility inventory.
+    Returns (facilities, facilities_by_stop, stops_lookup, station_counts),
+    where facilities is a list of facility dicts, facilities_by_stop maps
+    stop_id to that station's facility dicts and station_counts maps stop_id
+    to [n_operational, n_out_of_service].
     """
-    facilities_data = fetch_facilities()
-    alerts_data = fetch_accessibility_alerts()
-
     # Build lookup of included stops (name + coordinates + wheelchair_boarding for map)
     stops_lookup = {}
     for included in facilities_data.get("included", []):
@@ -124,150 +170,226 @@ def get_data_for_app():
                 "wheelchair_boarding": attrs.get("wheelchair_boarding", 0),
             }
 
-    # Build facility inventory
-    facilities = {}
+    # Build facility inventory, counting [operational, out_of_service] per
+    # station as we go so the station list needs no extra pass
+    facilities = []
+    by_id = {}  # random access for applying alerts
+    facilities_by_stop = {}
+    station_counts = defaultdict(lambda: [0, 0])
     for item in facilities_data.get("data", []):
         facility_id = item["id"]
         attrs = item["attributes"]
-        stop_id = item.get("relationships", {}).get("stop", {}).get("data", {}).get("id")
-
-        facilities[facility_id] = {
+        # Every real facility has a stop relationship, so index straight in
+        try:
+            stop_id = item["relationships"]["stop"]["data"]["id"]
+        except (KeyError, TypeError):
+            stop_id = None
+        stop = stops_lookup.get(stop_id)
+
+        facility = {
             "id": facility_id,
-            "type": attrs.get("type"),
+            "type": _intern(attrs.get("type")),
             "name": attrs.get("long_name"),
             "short_name": attrs.get("short_name"),
             "stop_id": stop_id,
-            "station_name": stops_lookup.get(stop_id, {}).get("name", "Unknown"),
+            "station_name": stop["name"] if stop else "Unknown",
             "status": "operational",
             "alert": None,
         }
+        facilities.append(facility)
+        by_id[facility_id] = facility
+        if stop_id is not None:
+            facilities_by_stop.setdefault(stop_id, []).append(facility)
+        station_counts[stop_id][0] += 1
 
     for alert in alerts_data.get("data", []):
         alert_attrs = alert["attributes"]
-        affected_facility_ids = extract_facility_ids_from_alert(alert)
-        active_periods = alert_attrs.get("active_period", [])
-        outage_start = active_periods[0].get("start") if active_periods else None
-
-        alert_summary = {
-            "id": alert["id"],
-            "header": alert_attrs.get("header"),
-            "description": alert_attrs.get("description"),
-            "cause": alert_attrs.get("cause"),
-            "effect": alert_attrs.get("effect"),
-            "updated_at": alert_attrs.get("updated_at"),
-            "outage_start": outage_start,
-        }
-        for facility_id in affected_facility_ids:
-            if facility_id in facilities:
-                facilities[facility_id]["status"] = "out_of_service"
-                facilities[facility_id]["alert"] = alert_summary
+        alert_summary = None
+        for entity in alert_attrs.get("informed_entity", []):
+            facility = by_id.get(entity.get("facility"))
+            if facility is None:
+                continue
+            # Only summarize alerts that touch a tracked facility
+            if alert_summary is None:
+                active_periods = alert_attrs.get("active_period", [])
+                outage_start = active_periods[0].get("start") if active_periods else None
+                alert_summary = {
+                    "id": alert["id"],
+                    "header": alert_attrs.get("header"),
+                    "description": alert_attrs.get("description"),
+                    "cause": _intern(alert_attrs.get("cause")),
+                    "effect": _intern(alert_attrs.get("effect")),
+                    "updated_at": alert_attrs.get("updated_at"),
+                    "outage_start": outage_start,
+                }
+            if facility["status"] == "operational":
+                counts = station_counts[facility["stop_id"]]
+                counts[0] -= 1
+                counts[1] += 1
+            facility["status"] = "out_of_service"
+            facility["alert"] = alert_summary
+
+    return facilities, facilities_by_stop, stops_lookup, station_counts
 
-    # Build stations list with coordinates and counts (for map markers)
-    station_counts = {}
-    for f in facilities.values():
-        sid = f["stop_id"]
-        if sid not in station_counts:
-            station_counts[sid] = {"operational": 0, "out_of_service": 0}
-        if f["status"] == "operational":
-            station_counts[sid]["operational"] += 1
-        else:
-            station_counts[sid]["out_of_service"] += 1
 
+def get_data_for_app():
+    """
+    Return facilities and stations for the Shiny app (map + station details).
+    Stations include id, name, lat, lon, and outage counts for map styling.
+    facilities_by_stop and wheelchair_by_station index the same data by
+    station ID, so callers can hand one station's data to
+    generate_station_report.
+    """
+    # The two endpoints are independent, so fetch them in parallel
+    fut_facilities = _EXECUTOR.submit(fetch_facilities)
+    fut_alerts = _EXECUTOR.submit(fetch_accessibility_alerts)
+    facilities_data = fut_facilities.result()
+    alerts_data = fut_alerts.result()
+
+    facilities, facilities_by_stop, stops_lookup, station_counts = _build_facilities(
+        facilities_data, alerts_data
+    )
+
+    # Build stations list with coordinates and counts (for map markers)
     stations = []
+    wheelchair_by_station = {}
     for stop_id, info in stops_lookup.items():
         lat, lon = info.get("latitude"), info.get("longitude")
         if lat is None or lon is None:
             continue
-        counts = station_counts.get(stop_id, {"operational": 0, "out_of_service": 0})
+        n_operational, n_out_of_service = station_counts.get(stop_id, (0, 0))
+        wheelchair_boarding = info.get("wheelchair_boarding", 0)
+        wheelchair_by_station[stop_id] = wheelchair_boarding
         stations.append({
             "id": stop_id,
             "name": info["name"],
             "lat": lat,
             "lon": lon,
-            "n_operational": counts["operational"],
-            "n_out_of_service": counts["out_of_service"],
-            "wheelchair_boarding": info.get("wheelchair_boarding", 0),
+            "n_operational": n_operational,
+            "n_out_of_service": n_out_of_service,
+            "wheelchair_boarding": wheelchair_boarding,
         })
 
-    return {"facilities": facilities, "stations": stations}
+    return {
+        "facilities": facilities,
+        "facilities_by_stop": facilities_by_stop,
+        "wheelchair_by_station": wheelchair_by_station,
+        "stations": stations,
+    }
 
 
-def _query_ollama(prompt, model="gemma3:12b"):
-    """Send a prompt to a local Ollama instance and return the response text."""
-    resp = requests.post(
+def _query_ollama_stream(prompt, model="gemma3:12b"):
+    """Send a prompt to a local Ollama instance and yield response text as it is generated."""
+    with _SESSION.post(
         "http://localhost:11434/api/generate",
         json={
             "model": model,
             "prompt": prompt,
-            "stream": False,
-            "options": {"num_predict": 300},
+            "stream": True,
+            # The prompt asks for two short paragraphs, which fit well within this
+            "options": {"num_predict": 180},
         },
-        timeout=60,
-    )
-    resp.raise_for_status()
-    return resp.json()["response"]
+        stream=True,
+        timeout=(3, 60),
+    ) as resp:
+        resp.raise_for_status()
+        # Ollama streams one JSON object per line until "done" is true
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = _json_loads(line)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"])
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                break
+
+
+def _query_ollama(prompt, model="gemma3:12b"):
+    """Send a prompt to a local Ollama instance and return the full response text."""
+    return "".join(_query_ollama_stream(prompt, model=model))
+
 
+# (upper bound in seconds, seconds per unit, unit) for _format_duration;
+# anything past the last bound is reported in years
+_MONTH_SECONDS = 86400 * 30.44
+_DURATION_BUCKETS = (
+    (3600, 60, "minute"),
+    (86400, 3600, "hour"),
+    (86400 * 30, 86400, "day"),
+    (_MONTH_SECONDS * 12, _MONTH_SECONDS, "month"),
+)
 
-def _format_duration(iso_timestamp):
-    """Convert an ISO timestamp to a human-readable duration like '3 days' or '2 months'."""
+
+def _format_duration(iso_timestamp, now=None):
+    """Convert an ISO timestamp to a human-readable duration like '3 days' or '2 months'.
+
+    `now` should be an aware UTC datetime; pass it in when formatting several
+    timestamps so they share one clock reading.
+    """
     if not iso_timestamp:
         return None
     try:
-        # Take first 19 chars (YYYY-MM-DDTHH:MM:SS) to strip any timezone offset
-        start = datetime.fromisoformat(iso_timestamp[:19])
-        diff = datetime.utcnow() - start
-        minutes = diff.total_seconds() / 60
-        if minutes < 0:
+        # MBTA timestamps carry a UTC offset; treat any without one as UTC
+        start = datetime.fromisoformat(iso_timestamp)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        diff = now - start
+        secs = diff.total_seconds()
+        if secs < 0:
             return "starting soon"
-        if minutes < 60:
-            n = int(minutes)
-            return f"{n} minute{'s' if n != 1 else ''}"
-        hours = minutes / 60
-        if hours < 24:
-            n = int(hours)
-            return f"{n} hour{'s' if n != 1 else ''}"
-        days = hours / 24
-        if days < 30:
-            n = int(days)
-            return f"{n} day{'s' if n != 1 else ''}"
-        months = days / 30.44
-        if months < 12:
-            n = int(months)
-            return f"{n} month{'s' if n != 1 else ''}"
-        years = days / 365.25
+        for threshold, divisor, unit in _DURATION_BUCKETS:
+            if secs < threshold:
+                n = int(secs / divisor)
+                return f"{n} {unit}{'s' if n != 1 else ''}"
+        years = secs / (86400 * 365.25)
         return f"{years:.1f} years"
     except Exception:
         return None
 
 
+# Facility types in the order they're summarized, with their display labels
+_FTYPE_ORDER = ("ELEVATOR", "ESCALATOR", "RAMP", "PORTABLE_BOARDING_LIFT")
+_TYPE_LABELS = {
+    "ELEVATOR": "elevator",
+    "ESCALATOR": "escalator",
+    "RAMP": "ramp",
+    "PORTABLE_BOARDING_LIFT": "portable lift",
+}
+
+
 def _build_station_prompt(station_name, station_facilities,
                           service_alerts=None, wheelchair_boarding=0):
     """Build a structured prompt for the AI accessibility report."""
     if service_alerts is None:
         service_alerts = []
 
-    # --- Facility type counts ---
-    type_labels = {
-        "ELEVATOR": "elevator",
-        "ESCALATOR": "escalator",
-        "RAMP": "ramp",
-        "PORTABLE_BOARDING_LIFT": "portable lift",
-    }
-    counts = {}
-    out_counts = {}
+    # --- Facility type counts and status partition (one pass) ---
+    counts = Counter()
+    out_counts = Counter()
+    op_counts = Counter()
+    operational = []
+    out_of_service = []
     for f in station_facilities:
         ftype = f.get("type", "UNKNOWN")
-        counts[ftype] = counts.get(ftype, 0) + 1
-        if f.get("status") == "out_of_service":
-            out_counts[ftype] = out_counts.get(ftype, 0) + 1
+        status = f.get("status")
+        counts[ftype] += 1
+        if status == "out_of_service":
+            out_counts[ftype] += 1
+            out_of_service.append(f)
+        elif status == "operational":
+            op_counts[ftype] += 1
+            operational.append(f)
 
     count_parts = []
-    for ftype in ("ELEVATOR", "ESCALATOR", "RAMP", "PORTABLE_BOARDING_LIFT"):
-        total = counts.get(ftype, 0)
+    for ftype in _FTYPE_ORDER:
+        total = counts[ftype]
         if total == 0:
             continue
-        out = out_counts.get(ftype, 0)
-        label = type_labels.get(ftype, ftype.lower())
+        out = out_counts[ftype]
+        label = _TYPE_LABELS.get(ftype, ftype.lower())
         count_parts.append(f"{label}s: {total} ({out} out)" if total != 1
                            else f"{label}s: 1 ({out} out)")
 
@@ -282,37 +404,31 @@ def _build_station_prompt(station_name, station_facilities,
         )
 
     # --- Facility details block ---
-    operational = [f for f in station_facilities if f.get("status") == "operational"]
-    out_of_service = [f for f in station_facilities if f.get("status") == "out_of_service"]
-
     facility_lines = []
+    now = datetime.now(timezone.utc)
 
     for f in out_of_service:
         name = f.get("name") or f.get("short_name") or ""
-        line = f"- {f['type']} \"{name}\": OUT OF SERVICE"
+        line_parts = [f"- {f['type']} \"{name}\": OUT OF SERVICE"]
 
         alert = f.get("alert")
         if alert:
-            duration = _format_duration(alert.get("outage_start"))
+            duration = _format_duration(alert.get("outage_start"), now)
             if duration:
-                line += f" (down {duration})"
+                line_parts.append(f" (down {duration})")
             cause = alert.get("cause", "")
             if cause:
-                line += f"\n  Cause: {cause}"
+                line_parts.append(f"\n  Cause: {cause}")
             if alert.get("header"):
-                line += f"\n  Alert: {alert['header']}"
+                line_parts.append(f"\n  Alert: {alert['header']}")
             desc = (alert.get("description") or "").strip()
             if desc:
-                line += f"\n  MBTA instructions: {desc}"
-        facility_lines.append(line)
+                line_parts.append(f"\n  MBTA instructions: {desc}")
+        facility_lines.append("".join(line_parts))
 
     if len(operational) > 6:
-        by_type = {}
-        for f in operational:
-            ftype = f.get("type", "UNKNOWN")
-            by_type[ftype] = by_type.get(ftype, 0) + 1
-        parts = [f"{count} {type_labels.get(t, t.lower())}(s)"
-                 for t, count in sorted(by_type.items())]
+        parts = [f"{count} {_TYPE_LABELS.get(t, t.lower())}(s)"
+                 for t, count in sorted(op_counts.items())]
         facility_lines.append(f"- {', '.join(parts)} operational")
     else:
         for f in operational:
@@ -325,10 +441,10 @@ def _build_station_prompt(station_name, station_facilities,
     if service_alerts:
         alert_lines = []
         for sa in service_alerts:
-            line = f"- [{sa['effect']}] {sa['header']}"
+            line_parts = [f"- [{sa['effect']}] {sa['header']}"]
             if sa.get("description"):
-                line += f"\n  Details: {sa['description'][:300]}"
-            alert_lines.append(line)
+                line_parts.append(f"\n  Details: {sa['description'][:300]}")
+            alert_lines.append("".join(line_parts))
         service_block = "\n".join(alert_lines)
     else:
         service_block = "(none)"
@@ -353,33 +469,85 @@ def _build_station_prompt(station_name, station_facilities,
     return prompt
 
 
-def generate_station_report(station_id, facilities, stations):
-    """Generate an AI report for a station. Called from R via reticulate."""
+# Generated reports keyed by station and a fingerprint of the data behind them,
+# so repeat clicks on an unchanged station skip the Ollama call
+REPORT_TTL = 60
+_REPORT_CACHE = {}
+_REPORT_CACHE_LOCK = threading.Lock()
+
+
+def _report_cache_key(station_id, station_facilities, service_alerts, wheelchair_boarding):
+    """Build a hashable fingerprint of everything that feeds a station report."""
+    facility_state = tuple(sorted(
+        (f.get("id"), f.get("status"), (f.get("alert") or {}).get("id"))
+        for f in station_facilities
+    ))
+    alert_state = tuple(
+        (sa["effect"], sa["header"], sa["description"]) for sa in service_alerts
+    )
+    return (station_id, wheelchair_boarding, facility_state, alert_state)
+
+
+def generate_station_report(station_id, station_facilities, wheelchair_boarding=0):
+    """
+    Generate an AI report for a station. Called from R via reticulate with
+    only this station's facilities (its facilities_by_stop entry) and
+    wheelchair_boarding value, so each click converts just that data rather
+    than the whole index.
+    """
     try:
-        # Collect facilities for this station
-        station_facilities = []
+        # A station with no facilities arrives from R as NULL -> None
+        station_facilities = station_facilities or []
         station_name = station_id
-        for f in facilities.values():
-            if f.get("stop_id") == station_id:
-                station_facilities.append(f)
-                station_name = f.get("station_name", station_id)
-
-        # Look up wheelchair_boarding from stations list
-        wheelchair_boarding = 0
-        for s in stations:
-            if s.get("id") == station_id:
-                wheelchair_boarding = s.get("wheelchair_boarding", 0)
-                break
+        if station_facilities:
+            station_name = station_facilities[0].get("station_name", station_id)
 
         # Fetch service alerts (shuttles, delays, etc.) for routes through this station
         service_alerts = fetch_route_alerts(station_id)
 
+        key = _report_cache_key(
+            station_id, station_facilities, service_alerts, wheelchair_boarding,
+        )
+        now = time.monotonic()
+        with _REPORT_CACHE_LOCK:
+            cached = _REPORT_CACHE.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
         prompt = _build_station_prompt(
             station_name, station_facilities, service_alerts=service_alerts,
             wheelchair_boarding=wheelchair_boarding,
         )
-        return _query_ollama(prompt)
+        report = _query_ollama(prompt)
+
+        with _REPORT_CACHE_LOCK:
+            # Drop expired entries so superseded fingerprints don't accumulate
+            for k in [k for k, (expires, _) in _REPORT_CACHE.items() if expires <= now]:
+                del _REPORT_CACHE[k]
+            _REPORT_CACHE[key] = (now + REPORT_TTL, report)
+        return report
     except Exception as e:
         return f"__error__: {e}"
 
 
+def generate_station_reports(station_ids, facilities_by_stop, wheelchair_by_station,
+                             max_workers=4):
+    """
+    Generate AI reports for several stations concurrently, e.g. to warm the
+    report cache. Returns a dict of station_id -> report text; failures use
+    the same "__error__: ..." form as generate_station_report.
+    """
+    # A single station ID from R arrives as a plain string
+    if isinstance(station_ids, str):
+        station_ids = [station_ids]
+    station_ids = list(station_ids)
+    # A dedicated pool caps concurrent Ollama requests at max_workers and keeps
+    # _EXECUTOR free for MBTA fetches
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        reports = pool.map(
+            lambda sid: generate_station_report(
+                sid, facilities_by_stop.get(sid), wheelchair_by_station.get(sid, 0),
+            ),
+            station_ids,
+        )
+        return dict(zip(station_ids, reports))